@@ -22,35 +22,134 @@ from __future__ import annotations
 
 import argparse
 import csv
-from dataclasses import dataclass
+import functools
+import io
+import os
+import warnings
+import zipfile
+from dataclasses import dataclass, field
+from functools import cached_property
 from pathlib import Path
-from typing import Iterable, List, Sequence, Tuple
+from operator import attrgetter
+from typing import Callable, Dict, Iterable, List, Sequence, Tuple
 
+import numpy as np
 
-@dataclass(frozen=True)
-class JointProbabilityTable:
-    """Container for a joint probability table.
-
-    The table is stored as a list of rows, each row holding floating point
-    probabilities.  Row and column labels are stored as sequences of strings.
-    """
-
-    row_labels: Sequence[str]
-    column_labels: Sequence[str]
-    values: Sequence[Sequence[float]]
+try:  # pragma: no cover - optional dependency
+    import pandas as pd
+except ImportError:  # pragma: no cover - pandas is not required
+    pd = None
 
-    def column(self, column: int) -> List[float]:
-        """Return the column at index *column* as a list."""
+try:  # pragma: no cover - optional dependency
+    import pyarrow as pa
+    from pyarrow import csv as pa_csv
+except ImportError:  # pragma: no cover - pyarrow is not required
+    pa = pa_csv = None
 
-        return [float(row[column]) for row in self.values]
 
-    def row(self, row_index: int) -> List[float]:
-        """Return the row at index *row_index* as a list."""
-
-        return [float(value) for value in self.values[row_index]]
+@dataclass(frozen=True, eq=False)
+class JointProbabilityTable:
+    """Container for a joint probability table.
 
+    The probabilities are stored as a single two dimensional floating point
+    array of shape ``(len(row_labels), len(column_labels))``.  Row and column
+    labels are stored as tuples of strings.  The values are kept read-only;
+    writable arrays are copied on construction.  The float64 row and column
+    totals and the label-to-position lookups are computed once on construction
+    and reused by every conditional query.  Tables compare and hash by identity.
+    """
 
-def load_joint_probability_table(path: Path) -> JointProbabilityTable:
+    row_labels: Tuple[str, ...]
+    column_labels: Tuple[str, ...]
+    values: np.ndarray
+    row_sums: np.ndarray = field(init=False, repr=False)
+    col_sums: np.ndarray = field(init=False, repr=False)
+    row_index: Dict[str, int] = field(init=False, repr=False)
+    column_index: Dict[str, int] = field(init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        # The derived totals and conditional matrices are only valid as long as
+        # the values never change, so keep a read-only array the caller cannot
+        # modify through its own reference.
+        values = np.asarray(self.values)
+        if values is self.values and values.flags.writeable:
+            values = values.copy()
+        values.flags.writeable = False
+        object.__setattr__(self, "values", values)
+        object.__setattr__(self, "row_labels", tuple(self.row_labels))
+        object.__setattr__(self, "column_labels", tuple(self.column_labels))
+        object.__setattr__(self, "row_sums", self.values.sum(axis=1, dtype=np.float64))
+        object.__setattr__(self, "col_sums", self.values.sum(axis=0, dtype=np.float64))
+        object.__setattr__(self, "row_index", _label_index(self.row_labels))
+        object.__setattr__(self, "column_index", _label_index(self.column_labels))
+
+    def column(self, column: int) -> np.ndarray:
+        """Return a view of the column at index *column*."""
+
+        return self.values[:, column]
+
+    def row(self, row_index: int) -> np.ndarray:
+        """Return a view of the row at index *row_index*."""
+
+        return self.values[row_index]
+
+    @cached_property
+    def p_given_col(self) -> np.ndarray:
+        """Read-only matrix whose columns are the distributions given each column.
+
+        Columns with zero total mass are left as zeros.
+        """
+
+        totals = np.where(self.col_sums > 0, self.col_sums, 1.0)
+        matrix = self.values / totals
+        matrix.flags.writeable = False
+        return matrix
+
+    @cached_property
+    def p_given_row(self) -> np.ndarray:
+        """Read-only matrix whose rows are the distributions given each row.
+
+        Rows with zero total mass are left as zeros.
+        """
+
+        totals = np.where(self.row_sums > 0, self.row_sums, 1.0)
+        matrix = self.values / totals[:, np.newaxis]
+        matrix.flags.writeable = False
+        return matrix
+
+
+# Per-axis lookup used by conditional_distribution.  Each entry holds accessors
+# for the axis labels, their label-to-position map, the axis totals, the
+# conditional distribution at a position, and the labels of the other axis.
+# The accessors take the table as argument so tables hold no reference cycles.
+_AxisSpec = Tuple[
+    Callable[[JointProbabilityTable], Tuple[str, ...]],
+    Callable[[JointProbabilityTable], Dict[str, int]],
+    Callable[[JointProbabilityTable], np.ndarray],
+    Callable[[JointProbabilityTable, int], np.ndarray],
+    Callable[[JointProbabilityTable], Tuple[str, ...]],
+]
+_AXES: Dict[str, _AxisSpec] = {
+    "column": (
+        attrgetter("column_labels"),
+        attrgetter("column_index"),
+        attrgetter("col_sums"),
+        lambda table, index: table.p_given_col[:, index],
+        attrgetter("row_labels"),
+    ),
+    "row": (
+        attrgetter("row_labels"),
+        attrgetter("row_index"),
+        attrgetter("row_sums"),
+        lambda table, index: table.p_given_row[index],
+        attrgetter("column_labels"),
+    ),
+}
+
+
+def load_joint_probability_table(
+    path: Path, dtype: np.dtype | type = np.float64, *, sidecar: bool = False
+) -> JointProbabilityTable:
     """Load a joint probability table stored as a CSV file.
 
     Parameters
@@ -58,58 +157,251 @@ def load_joint_probability_table(path: Path) -> JointProbabilityTable:
     path:
         Path to the CSV file.  The file must have the first row representing the
         column headers and the first column containing the row labels.
+    dtype:
+        Floating point type used to store the probabilities.  Pass
+        ``np.float32`` to halve the memory of large tables; totals and
+        conditional distributions are still computed in float64.
+    sidecar:
+        When true, the parsed table is also stored in a ``<name>.npz`` file
+        next to the CSV file and read from there by later runs, as long as the
+        CSV file has not been modified since.
+
+    Tables are cached per resolved path, inode, size and modification time, so
+    repeated loads of an unchanged file return the same (read-only) table
+    without parsing it again.
     """
 
-    with path.open(newline="") as fh:
-        reader = csv.reader(fh)
-        try:
-            header = next(reader)
-        except StopIteration as exc:  # pragma: no cover - guard against empty files
-            raise ValueError(f"The file {path} is empty") from exc
-
-        if len(header) < 2:
-            raise ValueError(
-                "The CSV file must contain at least one column label besides the row name column."
+    dtype = np.dtype(dtype)
+    if not np.issubdtype(dtype, np.floating):
+        raise ValueError(f"dtype must be a floating point type, got {dtype}.")
+
+    real_path = os.path.realpath(path)
+    stat = os.stat(real_path)
+    file_key = (stat.st_ino, stat.st_size, stat.st_mtime_ns)
+    return _load_cached(real_path, file_key, dtype, sidecar)
+
+
+@functools.lru_cache(maxsize=32)
+def _load_cached(
+    path: str, file_key: Tuple[int, int, int], dtype: np.dtype, sidecar: bool
+) -> JointProbabilityTable:
+    """Parse the CSV file at *path*.
+
+    *path* must be absolute, and *file_key* holds its inode, size and
+    modification time; it only serves as cache key.
+    """
+
+    if sidecar:
+        row_labels, column_labels, values = _read_with_sidecar(path)
+    else:
+        row_labels, column_labels, values = _read_csv(path)
+
+    if len(column_labels) < 1:
+        raise ValueError(
+            "The CSV file must contain at least one column label besides the row name column."
+        )
+    if not row_labels:
+        raise ValueError("The CSV file does not contain any data rows.")
+    if np.isnan(values).any():
+        raise ValueError(f"Encountered a missing or non-numeric probability in {path}.")
+    values = values.astype(dtype, copy=False)
+    values.flags.writeable = False
+
+    return JointProbabilityTable(row_labels=row_labels, column_labels=column_labels, values=values)
+
+
+def _read_with_sidecar(path: str) -> Tuple[List[str], List[str], np.ndarray]:
+    """Read *path* through a binary ``<name>.npz`` sidecar stored next to it.
+
+    The sidecar records the size and modification time of the CSV file it was
+    built from and is only used while both still match.  Otherwise the CSV
+    file is parsed and the sidecar is (re)written; failing to write it, e.g.
+    in a read-only directory, is not an error.
+    """
+
+    source = Path(path)
+    sidecar = source.with_name(source.name + ".npz")
+    stat = source.stat()
+    fingerprint = np.array([stat.st_size, stat.st_mtime_ns], dtype=np.int64)
+    try:
+        with np.load(sidecar, allow_pickle=False) as data:
+            if np.array_equal(data["source"], fingerprint):
+                return data["rows"].tolist(), data["cols"].tolist(), data["values"]
+    except (OSError, KeyError, ValueError, zipfile.BadZipFile):
+        pass  # Missing or unreadable sidecar: fall back to the CSV file.
+
+    row_labels, column_labels, values = _read_csv(path)
+    try:
+        np.savez(
+            sidecar,
+            source=fingerprint,
+            values=values,
+            rows=np.array(row_labels, dtype=str),
+            cols=np.array(column_labels, dtype=str),
+        )
+    except OSError:
+        pass
+    return row_labels, column_labels, values
+
+
+def _read_csv(path: str) -> Tuple[List[str], List[str], np.ndarray]:
+    """Read *path* into row labels, column labels and a float64 value array.
+
+    pyarrow's reader is used when it is installed, then the pandas C engine,
+    and finally a pure NumPy line parser when neither is available.
+    """
+
+    if pd is None:
+        return _read_csv_lines(path)
+
+    # Labels come from csv.reader for every backend, so duplicate headers are
+    # kept as written rather than renamed by pandas (``a``, ``a.1``).
+    header = _read_header(path)
+    try:
+        frame = _read_csv_frame(path, header[0])
+        values = frame.to_numpy(dtype=np.float64)
+    except (ValueError, pd.errors.ParserWarning) as exc:
+        # Neither backend reports ragged rows reliably (pandas pads short rows),
+        # so rescan the file to report the same errors as the other parsers.
+        _check_row_widths(path)
+        raise ValueError(f"Encountered a non-numeric probability in {path}.") from exc
+
+    return frame.index.astype(str).tolist(), header[1:], values
+
+
+def _read_header(path: str) -> List[str]:
+    """Return the header row of *path* as parsed by ``csv.reader``."""
+
+    with open(path, newline="") as fh:
+        header = next(csv.reader(fh), None)
+    if header is None:
+        raise ValueError(f"The file {path} is empty")
+    return header
+
+
+def _read_csv_frame(path: str, label_column: str) -> pd.DataFrame:
+    """Read *path* into a data frame indexed by the row labels.
+
+    The row labels in *label_column* are always read as strings, so labels
+    such as ``01`` are kept as written.
+    """
+
+    if pa_csv is not None:
+        options = pa_csv.ConvertOptions(column_types={label_column: pa.string()})
+        frame = pa_csv.read_csv(path, convert_options=options).to_pandas()
+    else:
+        with warnings.catch_warnings():
+            # With index_col=False pandas truncates over-long rows with a warning.
+            warnings.simplefilter("error", pd.errors.ParserWarning)
+            frame = pd.read_csv(
+                path,
+                engine="c",
+                index_col=False,
+                dtype={0: str},
+                keep_default_na=False,
+                low_memory=False,
+                cache_dates=False,
             )
+    return frame.set_index(frame.columns[0])
 
-        column_labels = header[1:]
-        row_labels: List[str] = []
-        values: List[List[float]] = []
 
+def _check_row_widths(path: str) -> None:
+    """Raise a ``ValueError`` if *path* is empty or has rows of the wrong width."""
+
+    with open(path, newline="") as fh:
+        reader = csv.reader(fh)
+        header = next(reader, None)
+        if header is None:
+            raise ValueError(f"The file {path} is empty")
+
+        width = len(header) - 1
+        index = 0
         for row in reader:
             if not row:
                 continue
-            row_labels.append(row[0])
-            try:
-                values.append([float(value) for value in row[1:]])
-            except ValueError as exc:  # pragma: no cover - guard for malformed numbers
+            if len(row) - 1 != width:
                 raise ValueError(
-                    f"Encountered a non-numeric probability in row {row!r}."
-                ) from exc
-
-        if not values:
-            raise ValueError("The CSV file does not contain any data rows.")
-
-    # Basic validation of the table shape.
-    width = len(column_labels)
-    for index, row in enumerate(values):
-        if len(row) != width:
-            raise ValueError(
-                "All rows in the joint probability table must have the same length. "
-                f"Row {index} has length {len(row)}, expected {width}."
-            )
+                    "All rows in the joint probability table must have the same length. "
+                    f"Row {index} has length {len(row) - 1}, expected {width}."
+                )
+            index += 1
 
-    return JointProbabilityTable(row_labels=row_labels, column_labels=column_labels, values=values)
 
+def _read_csv_lines(path: str) -> Tuple[List[str], List[str], np.ndarray]:
+    """Parse *path* line by line without pandas.
+
+    Each data row is converted with a single ``np.fromstring`` call straight
+    into a preallocated array that doubles in size when it fills up.  Lines
+    containing quotes are split with ``csv.reader`` instead; quoted fields
+    spanning several lines are not supported.
+    """
+
+    with io.open(path, "r", buffering=1 << 20, newline="") as fh:
+        header = fh.readline()
+        if not header:  # pragma: no cover - guard against empty files
+            raise ValueError(f"The file {path} is empty")
+        column_labels = next(csv.reader([header]))[1:]
+        width = len(column_labels)
 
-def _resolve_index(labels: Sequence[str], value: str) -> int:
+        row_labels: List[str] = []
+        values = np.empty((64, width), dtype=np.float64)
+        for line in fh:
+            line = line.rstrip("\r\n")
+            if not line:
+                continue
+            if '"' in line:
+                label, *fields = next(csv.reader([line]))
+                field_count = len(fields)
+            else:
+                label, separator, rest = line.partition(",")
+                field_count = rest.count(",") + 1 if separator else 0
+            if field_count != width:
+                raise ValueError(
+                    "All rows in the joint probability table must have the same length. "
+                    f"Row {len(row_labels)} has length {field_count}, expected {width}."
+                )
+
+            with warnings.catch_warnings():
+                warnings.simplefilter("error", DeprecationWarning)
+                try:
+                    if '"' in line:
+                        row = np.array(fields, dtype=np.float64)
+                    else:
+                        row = np.fromstring(rest, dtype=np.float64, sep=",")
+                except (DeprecationWarning, ValueError):
+                    row = None
+            # A correctly delimited row that does not parse to *width* numbers
+            # contains an empty or non-numeric cell.
+            if row is None or row.size != width:
+                raise ValueError(f"Encountered a non-numeric probability in row {line!r}.")
+
+            if len(row_labels) == len(values):
+                values = np.resize(values, (2 * len(values), width))
+            values[len(row_labels)] = row
+            row_labels.append(label)
+
+    return row_labels, column_labels, values[: len(row_labels)].copy()
+
+
+def _label_index(labels: Sequence[str]) -> Dict[str, int]:
+    """Map each label to the position of its first occurrence in *labels*."""
+
+    index: Dict[str, int] = {}
+    for position, label in enumerate(labels):
+        index.setdefault(label, position)
+    return index
+
+
+def _resolve_index(labels: Sequence[str], index_map: Dict[str, int], value: str) -> int:
     """Resolve *value* as either a 1-based index or a label.
 
     Parameters
     ----------
     labels:
-        Available labels for the axis.  When *value* cannot be interpreted as an
-        integer, the function looks for a matching label.
+        Available labels for the axis.
+    index_map:
+        Mapping from label to position for the axis.  When *value* cannot be
+        interpreted as an integer, the function looks up the matching label.
     value:
         Either a string representation of a 1-based index or the label itself.
     """
@@ -126,8 +418,8 @@ def _resolve_index(labels: Sequence[str], value: str) -> int:
         )
 
     try:
-        return labels.index(value)
-    except ValueError as exc:
+        return index_map[value]
+    except KeyError as exc:
         raise ValueError(
             f"Value {value!r} is not one of the available labels: {', '.join(labels)}"
         ) from exc
@@ -135,7 +427,7 @@ def _resolve_index(labels: Sequence[str], value: str) -> int:
 
 def conditional_distribution(
     table: JointProbabilityTable, *, condition_axis: str, condition_value: str
-) -> Tuple[List[str], List[float]]:
+) -> Tuple[Sequence[str], np.ndarray]:
     """Compute a conditional distribution from a joint probability table.
 
     Parameters
@@ -152,38 +444,38 @@ def conditional_distribution(
     -------
     tuple of (labels, probabilities)
         The labels correspond to the axis that is *not* conditioned on.  The
-        probabilities represent the conditional distribution for those labels
-        given the conditioning value.
+        probabilities are a read-only float64 array holding the conditional
+        distribution for those labels given the conditioning value.  The
+        conditional matrices are computed on the first query against a table,
+        so later queries only take a slice.
     """
 
-    axis = condition_axis.lower()
-    if axis not in {"column", "row"}:
-        raise ValueError("condition_axis must be either 'column' or 'row'.")
-
-    if axis == "column":
-        column_index = _resolve_index(table.column_labels, condition_value)
-        raw_values = table.column(column_index)
-        target_labels = list(table.row_labels)
-    else:
-        row_index = _resolve_index(table.row_labels, condition_value)
-        raw_values = table.row(row_index)
-        target_labels = list(table.column_labels)
-
-    total = sum(raw_values)
-    if total <= 0:
+    try:
+        labels, index_map, totals, conditional, target_labels = _AXES[
+            condition_axis.lower()
+        ]
+    except KeyError as exc:
+        raise ValueError("condition_axis must be either 'column' or 'row'.") from exc
+
+    index = _resolve_index(labels(table), index_map(table), condition_value)
+    if totals(table)[index] <= 0:
         raise ValueError(
             "The selected row or column has a total probability mass that is not strictly positive."
         )
 
-    conditional_probs = [value / total for value in raw_values]
-    return target_labels, conditional_probs
+    return target_labels(table), conditional(table, index)
 
 
-def format_distribution(labels: Iterable[str], probabilities: Iterable[float]) -> str:
+def format_distribution(
+    labels: Iterable[str], probabilities: Iterable[float] | np.ndarray
+) -> str:
     """Format a conditional distribution for display."""
 
-    parts = [f"{label}: {prob:.4f}" for label, prob in zip(labels, probabilities)]
-    return "[" + ", ".join(parts) + "]"
+    if isinstance(probabilities, np.ndarray):
+        formatted: Iterable[str] = np.char.mod("%.4f", probabilities).tolist()
+    else:
+        formatted = (f"{prob:.4f}" for prob in probabilities)
+    return "[" + ", ".join(f"{label}: {prob}" for label, prob in zip(labels, formatted)) + "]"
 
 
 def parse_arguments(argv: Sequence[str] | None = None) -> argparse.Namespace:
@@ -207,13 +499,18 @@ def parse_arguments(argv: Sequence[str] | None = None) -> argparse.Namespace:
         required=True,
         help="Label or 1-based index of the row/column to condition on.",
     )
+    parser.add_argument(
+        "--sidecar",
+        action="store_true",
+        help="Cache the parsed table in a .npz file next to the CSV file.",
+    )
 
     return parser.parse_args(argv)
 
 
 def main(argv: Sequence[str] | None = None) -> None:
     args = parse_arguments(argv)
-    table = load_joint_probability_table(args.file)
+    table = load_joint_probability_table(args.file, sidecar=args.sidecar)
     labels, probabilities = conditional_distribution(
         table, condition_axis=args.condition_axis, condition_value=args.condition_value
     )
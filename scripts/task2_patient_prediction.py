@@ -11,25 +11,42 @@ from __future__ import annotations
 
 import argparse
 import math
+import warnings
 from typing import Sequence
 
+import numpy as np
 
-def parse_probability_vector(raw: str) -> list[float]:
+# Number of distinct orderings of a 10 patient sequence with ``n`` urgent patients.
+_BINOM10 = np.array([math.comb(10, n) for n in range(11)], dtype=np.float64)
+
+
+def _parse_array(raw: str, dtype: type, message: str) -> np.ndarray:
+    """Parse a comma separated string into a 1-D array of *dtype*.
+
+    ``np.fromstring`` only warns and returns the prefix it managed to read when
+    it meets malformed input, so the warning is promoted to an error here.
+    """
+
+    with warnings.catch_warnings():
+        warnings.simplefilter("error", DeprecationWarning)
+        try:
+            return np.fromstring(raw, dtype=dtype, sep=",")
+        except (DeprecationWarning, ValueError) as exc:
+            raise argparse.ArgumentTypeError(message) from exc
+
+
+def parse_probability_vector(raw: str) -> np.ndarray:
     """Parse a comma separated probability vector."""
 
-    parts = [part.strip() for part in raw.split(",") if part.strip()]
-    if len(parts) != 11:
+    values = _parse_array(raw, np.float64, "Probabilities must be numeric values.")
+    if values.size != 11:
         raise argparse.ArgumentTypeError(
             "The probability vector must contain exactly 11 comma separated values."
         )
-    try:
-        values = [float(part) for part in parts]
-    except ValueError as exc:  # pragma: no cover - argument parsing guard
-        raise argparse.ArgumentTypeError("Probabilities must be numeric values.") from exc
 
-    if any(value < 0 for value in values):
+    if (values < 0).any():
         raise argparse.ArgumentTypeError("Probabilities must be non-negative numbers.")
-    total = sum(values)
+    total = float(values.sum())
     if not math.isclose(total, 1.0, rel_tol=1e-9, abs_tol=1e-9):
         raise argparse.ArgumentTypeError(
             "The probabilities must sum to 1.0 (within a tolerance of 1e-9)."
@@ -37,22 +54,23 @@ def parse_probability_vector(raw: str) -> list[float]:
     return values
 
 
-def parse_sequence(raw: str) -> list[int]:
+def parse_sequence(raw: str) -> np.ndarray:
     """Parse a comma separated sequence of 0/1 integers."""
 
-    parts = [part.strip() for part in raw.split(",") if part.strip()]
-    if len(parts) != 9:
+    message = "Each patient entry must be either 0 (non-urgent) or 1 (urgent)."
+    # Parse wide and narrow only after validation so out-of-range values cannot wrap.
+    sequence = _parse_array(raw, np.int64, message)
+    if sequence.size != 9:
         raise argparse.ArgumentTypeError(
             "The patient sequence must contain exactly nine comma separated entries."
         )
-    sequence: list[int] = []
-    for part in parts:
-        if part not in {"0", "1"}:
-            raise argparse.ArgumentTypeError(
-                "Each patient entry must be either 0 (non-urgent) or 1 (urgent)."
-            )
-        sequence.append(int(part))
-    return sequence
+    if not ((sequence == 0) | (sequence == 1)).all():
+        raise argparse.ArgumentTypeError(message)
+    # np.fromstring also accepts spellings such as "+1", "01" or "-0"; only the
+    # exact tokens 0 and 1 are valid entries.
+    if "".join(raw.split()) != ",".join(map(str, sequence.tolist())):
+        raise argparse.ArgumentTypeError(message)
+    return sequence.astype(np.int8)
 
 
 def sequence_probability(probabilities: Sequence[float], sequence: Sequence[int]) -> float:
@@ -68,11 +86,30 @@ def sequence_probability(probabilities: Sequence[float], sequence: Sequence[int]
     if not 0 <= urgent_count <= 10:
         raise ValueError("A sequence must contain between 0 and 10 urgent patients (inclusive).")
 
-    total_configurations = math.comb(10, urgent_count)
-    if total_configurations == 0:
-        raise ValueError("Invalid number of urgent patients for a 10 person sequence.")
+    return probabilities[urgent_count] / _BINOM10[urgent_count]
+
+
+def weighted_prior(probabilities: Sequence[float]) -> np.ndarray:
+    """Return the probability of each single sequence with ``n`` urgent patients.
+
+    Entry ``n`` equals ``probabilities[n] / C(10, n)``, i.e. the value that
+    :func:`sequence_probability` returns for any sequence with ``n`` urgent
+    patients.
+    """
+
+    if len(probabilities) != 11:
+        raise ValueError("The probability vector must have exactly 11 entries (p0..p10).")
+    return np.asarray(probabilities, dtype=np.float64) / _BINOM10
+
+
+def _predict_kernel(weighted: np.ndarray, urgent_counts: np.ndarray) -> np.ndarray:
+    """Return ``w[k + 1] / (w[k + 1] + w[k])`` for every count ``k``.
 
-    return probabilities[urgent_count] / total_configurations
+    Counts whose two candidate sequences both have zero mass yield ``nan``.
+    """
+
+    likelihood_last_urgent = weighted[urgent_counts + 1]
+    return likelihood_last_urgent / (likelihood_last_urgent + weighted[urgent_counts])
 
 
 def predict_tenth_patient(probabilities: Sequence[float], observed: Sequence[int]) -> float:
@@ -87,26 +124,79 @@ def predict_tenth_patient(probabilities: Sequence[float], observed: Sequence[int
         the observed patients.
     """
 
-    if len(probabilities) != 11:
-        raise ValueError("The probability vector must have exactly 11 entries (p0..p10).")
-    if len(observed) != 9:
+    weighted = weighted_prior(probabilities)
+    observed = np.asarray(observed)
+    if observed.shape != (9,):
         raise ValueError("Exactly nine patients must be observed to make the prediction.")
+    if not ((observed == 0) | (observed == 1)).all():
+        raise ValueError("The observed patients must be encoded as 0 (non-urgent) or 1 (urgent).")
 
-    # Evaluate the likelihood of the two possible 10 patient sequences.
-    likelihood_last_urgent = sequence_probability(
-        probabilities, tuple(observed) + (1,)
-    )
-    likelihood_last_nonurgent = sequence_probability(
-        probabilities, tuple(observed) + (0,)
-    )
+    return predict_tenth_patient_from_count(weighted, int(observed.sum()))
 
-    denominator = likelihood_last_urgent + likelihood_last_nonurgent
-    if denominator == 0:
+
+def predict_tenth_patient_from_count(weighted: np.ndarray, urgent_count: int) -> float:
+    """Compute the probability that the 10th patient is urgent from a running count.
+
+    Parameters
+    ----------
+    weighted:
+        Per-sequence probabilities as returned by :func:`weighted_prior`.  When
+        predicting repeatedly, compute them once and pass the same array.
+    urgent_count:
+        Number of urgent patients among the nine observed patients.
+    """
+
+    if not 0 <= urgent_count <= 9:
+        raise ValueError("The urgent count must be between 0 and 9 for nine observed patients.")
+
+    with np.errstate(invalid="ignore"):
+        probability = float(_predict_kernel(weighted, urgent_count))
+    if math.isnan(probability):
+        raise ValueError(
+            "The provided probabilities assign zero mass to all sequences consistent with the observations."
+        )
+
+    return probability
+
+
+def predict_tenth_patient_batch(
+    probabilities: Sequence[float], observed: np.ndarray
+) -> np.ndarray:
+    """Vectorised :func:`predict_tenth_patient` over many observation sequences.
+
+    Parameters
+    ----------
+    probabilities:
+        Iterable containing ``p0`` .. ``p10`` as described in the assignment.
+    observed:
+        Array of shape ``(N, 9)`` where each row encodes the urgency (1) or
+        non-urgency (0) of nine observed patients.
+
+    Returns
+    -------
+    numpy.ndarray
+        Array of shape ``(N,)`` with the probability that the 10th patient is
+        urgent for each row of *observed*.
+    """
+
+    weighted = weighted_prior(probabilities)
+    observed = np.asarray(observed)
+    if observed.ndim != 2 or observed.shape[1] != 9:
+        raise ValueError("Exactly nine patients must be observed to make the prediction.")
+    if not ((observed == 0) | (observed == 1)).all():
+        raise ValueError("The observed patients must be encoded as 0 (non-urgent) or 1 (urgent).")
+
+    # The likelihood of a full sequence only depends on its urgent count, so the
+    # two candidate sequences have k + 1 and k urgent patients respectively.
+    urgent_counts = observed.sum(axis=1).astype(np.intp)
+    with np.errstate(invalid="ignore"):
+        posteriors = _predict_kernel(weighted, urgent_counts)
+    if np.isnan(posteriors).any():
         raise ValueError(
             "The provided probabilities assign zero mass to all sequences consistent with the observations."
         )
 
-    return likelihood_last_urgent / denominator
+    return posteriors
 
 
 def parse_arguments(argv: Sequence[str] | None = None) -> argparse.Namespace: